@@ -7,6 +7,46 @@ from llm_adapters import create_llm_adapter
 from embedding_adapters import create_embedding_adapter
 
 
+# LLM / Embedding 配置的默认值，界面初始化与加载配置时统一以此补全缺失字段
+DEFAULT_LLM_CONFIG = {
+    "api_key": "",
+    "base_url": "https://api.openai.com/v1",
+    "model_name": "gpt-4o-mini",
+    "temperature": 0.7,
+    "max_tokens": 8192,
+    "timeout": 600
+}
+
+DEFAULT_EMBEDDING_CONFIG = {
+    "api_key": "",
+    "base_url": "https://api.openai.com/v1",
+    "model_name": "text-embedding-ada-002",
+    "retrieval_k": 4
+}
+
+def _coerce(value, cast, default):
+    """将 value 转换为 cast 类型，失败时返回 default。"""
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return default
+
+def normalize_llm_config(llm_conf: dict) -> dict:
+    """以默认值补全 LLM 配置，并一次性将数值字段转换为正确类型。"""
+    conf = dict(DEFAULT_LLM_CONFIG)
+    conf.update(llm_conf or {})
+    conf["temperature"] = _coerce(conf["temperature"], float, DEFAULT_LLM_CONFIG["temperature"])
+    conf["max_tokens"] = _coerce(conf["max_tokens"], int, DEFAULT_LLM_CONFIG["max_tokens"])
+    conf["timeout"] = _coerce(conf["timeout"], int, DEFAULT_LLM_CONFIG["timeout"])
+    return conf
+
+def normalize_embedding_config(emb_conf: dict) -> dict:
+    """以默认值补全 Embedding 配置，并一次性将数值字段转换为正确类型。"""
+    conf = dict(DEFAULT_EMBEDDING_CONFIG)
+    conf.update(emb_conf or {})
+    conf["retrieval_k"] = _coerce(conf["retrieval_k"], int, DEFAULT_EMBEDDING_CONFIG["retrieval_k"])
+    return conf
+
 def load_config(config_file: str) -> dict:
     """从指定的 config_file 加载配置，若不存在则返回空字典。"""
     if os.path.exists(config_file):
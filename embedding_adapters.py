@@ -2,8 +2,11 @@
 # -*- coding: utf-8 -*-
 import logging
 import traceback
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import requests
+from requests.adapters import HTTPAdapter
 from langchain_openai import AzureOpenAIEmbeddings, OpenAIEmbeddings
 
 def ensure_openai_base_url_has_v1(url: str) -> str:
@@ -19,6 +22,31 @@ def ensure_openai_base_url_has_v1(url: str) -> str:
             url = url.rstrip('/') + '/v1'
     return url
 
+# 每次请求只能嵌入一条文本的接口，批量嵌入时的最大并发请求数
+EMBEDDING_MAX_WORKERS = 8
+
+def embed_texts_concurrently(embed_func, texts: List[str]) -> List[List[float]]:
+    """
+    并发调用 embed_func 逐条嵌入 texts，返回结果与输入顺序一致。
+    """
+    if len(texts) <= 1:
+        return [embed_func(text) for text in texts]
+    with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_WORKERS, len(texts))) as executor:
+        return list(executor.map(embed_func, texts))
+
+def create_http_session() -> requests.Session:
+    """
+    为单个 Embedding 适配器创建 HTTP 会话：复用 TCP/TLS 连接，避免每次嵌入请求重新握手。
+    连接池大小与并发嵌入数保持一致，保证并发请求都能复用连接。
+    会话按适配器实例各自持有，不同服务商之间不共享；同时拒绝保存 Cookie，
+    并发嵌入的各线程只调用 post()，不会修改会话上的任何共享状态。
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    session.mount("http://", HTTPAdapter(pool_connections=EMBEDDING_MAX_WORKERS, pool_maxsize=EMBEDDING_MAX_WORKERS))
+    session.mount("https://", HTTPAdapter(pool_connections=EMBEDDING_MAX_WORKERS, pool_maxsize=EMBEDDING_MAX_WORKERS))
+    return session
+
 class BaseEmbeddingAdapter:
     """
     Embedding 接口统一基类
@@ -80,13 +108,10 @@ class OllamaEmbeddingAdapter(BaseEmbeddingAdapter):
     def __init__(self, model_name: str, base_url: str):
         self.model_name = model_name
         self.base_url = base_url.rstrip("/")
+        self._session = create_http_session()
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        embeddings = []
-        for text in texts:
-            vec = self._embed_single(text)
-            embeddings.append(vec)
-        return embeddings
+        return embed_texts_concurrently(self._embed_single, texts)
 
     def embed_query(self, query: str) -> List[float]:
         return self._embed_single(query)
@@ -109,7 +134,7 @@ class OllamaEmbeddingAdapter(BaseEmbeddingAdapter):
             "prompt": text
         }
         try:
-            response = requests.post(url, json=data)
+            response = self._session.post(url, json=data)
             response.raise_for_status()
             result = response.json()
             if "embedding" not in result:
@@ -133,6 +158,7 @@ class MLStudioEmbeddingAdapter(BaseEmbeddingAdapter):
             "Content-Type": "application/json"
         }
         self.model_name = model_name
+        self._session = create_http_session()
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         try:
@@ -140,7 +166,7 @@ class MLStudioEmbeddingAdapter(BaseEmbeddingAdapter):
                 "input": texts,
                 "model": self.model_name
             }
-            response = requests.post(self.url, json=payload, headers=self.headers)
+            response = self._session.post(self.url, json=payload, headers=self.headers)
             response.raise_for_status()
             result = response.json()
             if "data" not in result:
@@ -160,7 +186,7 @@ class MLStudioEmbeddingAdapter(BaseEmbeddingAdapter):
                 "input": query,
                 "model": self.model_name
             }
-            response = requests.post(self.url, json=payload, headers=self.headers)
+            response = self._session.post(self.url, json=payload, headers=self.headers)
             response.raise_for_status()
             result = response.json()
             if "data" not in result or not result["data"]:
@@ -189,13 +215,10 @@ class GeminiEmbeddingAdapter(BaseEmbeddingAdapter):
         self.api_key = api_key
         self.model_name = model_name
         self.base_url = base_url.rstrip("/")
+        self._session = create_http_session()
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        embeddings = []
-        for text in texts:
-            vec = self._embed_single(text)
-            embeddings.append(vec)
-        return embeddings
+        return embed_texts_concurrently(self._embed_single, texts)
 
     def embed_query(self, query: str) -> List[float]:
         return self._embed_single(query)
@@ -215,7 +238,7 @@ class GeminiEmbeddingAdapter(BaseEmbeddingAdapter):
         }
 
         try:
-            response = requests.post(url, json=payload)
+            response = self._session.post(url, json=payload)
             print(response.text)
             response.raise_for_status()
             result = response.json()
@@ -247,33 +270,16 @@ class SiliconFlowEmbeddingAdapter(BaseEmbeddingAdapter):
             "Authorization": "Bearer {api_key}".format(api_key=api_key),
             "Content-Type": "application/json"
         }
+        self._session = create_http_session()
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        embeddings = []
-        for text in texts:
-            try:
-                self.payload["input"] = text
-                response = requests.post(self.url, json=self.payload, headers=self.headers)
-                response.raise_for_status()
-                result = response.json()
-                if not result or "data" not in result or not result["data"]:
-                    logging.error(f"Invalid response format from SiliconFlow API: {result}")
-                    embeddings.append([])
-                    continue
-                emb = result["data"][0].get("embedding", [])
-                embeddings.append(emb)
-            except requests.exceptions.RequestException as e:
-                logging.error(f"SiliconFlow API request failed: {str(e)}")
-                embeddings.append([])
-            except (KeyError, IndexError, ValueError, TypeError) as e:
-                logging.error(f"Error parsing SiliconFlow API response: {str(e)}")
-                embeddings.append([])
-        return embeddings
+        return embed_texts_concurrently(self.embed_query, texts)
 
     def embed_query(self, query: str) -> List[float]:
         try:
-            self.payload["input"] = query
-            response = requests.post(self.url, json=self.payload, headers=self.headers)
+            # 每次请求单独构造 payload，避免并发嵌入时互相覆盖 input
+            payload = dict(self.payload, input=query)
+            response = self._session.post(self.url, json=payload, headers=self.headers)
             response.raise_for_status()
             result = response.json()
             if not result or "data" not in result or not result["data"]:
@@ -1,7 +1,8 @@
 # llm_adapters.py
 # -*- coding: utf-8 -*-
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Iterator, Optional
 from langchain_openai import ChatOpenAI, AzureChatOpenAI
 from google import genai
 from google.genai import types
@@ -38,6 +39,12 @@ class BaseLLMAdapter:
     def invoke(self, prompt: str) -> str:
         raise NotImplementedError("Subclasses must implement .invoke(prompt) method.")
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        以流式方式逐段返回模型输出。不支持流式的后端默认一次性返回完整结果。
+        """
+        yield self.invoke(prompt)
+
 class DeepSeekAdapter(BaseLLMAdapter):
     """
     适配官方/OpenAI兼容接口（使用 langchain.ChatOpenAI）
@@ -66,6 +73,11 @@ class DeepSeekAdapter(BaseLLMAdapter):
             return ""
         return response.content
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self._client.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
 class OpenAIAdapter(BaseLLMAdapter):
     """
     适配官方/OpenAI兼容接口（使用 langchain.ChatOpenAI）
@@ -94,6 +106,11 @@ class OpenAIAdapter(BaseLLMAdapter):
             return ""
         return response.content
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self._client.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
 class GeminiAdapter(BaseLLMAdapter):
     """
     适配 Google Gemini (Google Generative AI) 接口
@@ -164,6 +181,11 @@ class AzureOpenAIAdapter(BaseLLMAdapter):
             return ""
         return response.content
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self._client.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
 class OllamaAdapter(BaseLLMAdapter):
     """
     Ollama 同样有一个 OpenAI-like /v1/chat 接口，可直接使用 ChatOpenAI。
@@ -195,6 +217,11 @@ class OllamaAdapter(BaseLLMAdapter):
             return ""
         return response.content
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self._client.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
 class MLStudioAdapter(BaseLLMAdapter):
     def __init__(self, api_key: str, base_url: str, model_name: str, max_tokens: int, temperature: float = 0.7, timeout: Optional[int] = 600):
         self.base_url = check_base_url(base_url)
@@ -224,6 +251,11 @@ class MLStudioAdapter(BaseLLMAdapter):
             logging.error(f"ML Studio API 调用超时或失败: {e}")
             return ""
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        for chunk in self._client.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
 class AzureAIAdapter(BaseLLMAdapter):
     """
     适配 Azure AI Inference 接口，用于访问Azure AI服务部署的模型
@@ -307,6 +339,20 @@ class VolcanoEngineAIAdapter(BaseLLMAdapter):
             logging.error(f"火山引擎API调用超时或失败: {e}")
             return ""
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self._client.chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": "你是DeepSeek，是一个 AI 人工智能助手"},
+                {"role": "user", "content": prompt},
+            ],
+            timeout=self.timeout,
+            stream=True
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
 class SiliconFlowAdapter(BaseLLMAdapter):
     def __init__(self, api_key: str, base_url: str, model_name: str, max_tokens: int, temperature: float = 0.7, timeout: Optional[int] = 600):
         self.base_url = check_base_url(base_url)
@@ -339,6 +385,20 @@ class SiliconFlowAdapter(BaseLLMAdapter):
             logging.error(f"硅基流动API调用超时或失败: {e}")
             return ""
 
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self._client.chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": "你是DeepSeek，是一个 AI 人工智能助手"},
+                {"role": "user", "content": prompt},
+            ],
+            timeout=self.timeout,
+            stream=True
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
 def create_llm_adapter(
     interface_format: str,
     base_url: str,
@@ -350,7 +410,20 @@ def create_llm_adapter(
 ) -> BaseLLMAdapter:
     """
     工厂函数：根据 interface_format 返回不同的适配器实例。
+    相同参数的适配器会被缓存复用，避免每次调用都重建底层客户端和 HTTP 连接池。
     """
+    return _create_llm_adapter_cached(interface_format, base_url, model_name, api_key, temperature, max_tokens, timeout)
+
+@lru_cache(maxsize=16)
+def _create_llm_adapter_cached(
+    interface_format: str,
+    base_url: str,
+    model_name: str,
+    api_key: str,
+    temperature: float,
+    max_tokens: int,
+    timeout: int
+) -> BaseLLMAdapter:
     fmt = interface_format.strip().lower()
     if fmt == "deepseek":
         return DeepSeekAdapter(api_key, base_url, model_name, max_tokens, temperature, timeout)
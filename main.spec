@@ -48,7 +48,7 @@ exe = EXE(
     [],
     exclude_binaries=True,
     name='AI_NovelGenerator_V1.4.4',
-    debug=True,
+    debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
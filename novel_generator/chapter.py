@@ -31,11 +31,8 @@ def get_last_n_chapters_text(chapters_dir: str, current_chapter_num: int, n: int
     start_chap = max(1, current_chapter_num - n)
     for c in range(start_chap, current_chapter_num):
         chap_file = os.path.join(chapters_dir, f"chapter_{c}.txt")
-        if os.path.exists(chap_file):
-            text = read_file(chap_file).strip()
-            texts.append(text)
-        else:
-            texts.append("")
+        # read_file 在文件不存在时返回空字符串，无需预先 os.path.exists
+        texts.append(read_file(chap_file).strip())
     return texts
 
 def summarize_recent_chapters(
@@ -433,7 +430,8 @@ def build_chapter_prompt(
                     embedding_adapter=embedding_adapter,
                     query=group,
                     filepath=filepath,
-                    k=actual_k
+                    k=actual_k,
+                    store=store
                 )
                 if context:
                     if any(kw in group.lower() for kw in ["技法", "手法", "模板"]):
@@ -531,10 +529,14 @@ def generate_chapter_draft(
     interface_format: str = "openai",
     max_tokens: int = 2048,
     timeout: int = 600,
-    custom_prompt_text: str = None
+    custom_prompt_text: str = None,
+    stream_callback=None,
+    stream_reset_callback=None
 ) -> str:
     """
     生成章节草稿，支持自定义提示词
+    若提供 stream_callback，则以流式方式调用模型，每收到一段输出即回调 stream_callback(delta)；
+    重试前会回调 stream_reset_callback()，调用方应丢弃此前已收到的输出
     """
     if custom_prompt_text is None:
         prompt_text = build_chapter_prompt(
@@ -575,7 +577,12 @@ def generate_chapter_draft(
         timeout=timeout
     )
 
-    chapter_content = invoke_with_cleaning(llm_adapter, prompt_text)
+    chapter_content = invoke_with_cleaning(
+        llm_adapter,
+        prompt_text,
+        on_delta=stream_callback,
+        on_retry=stream_reset_callback
+    )
     if not chapter_content.strip():
         logging.warning("Generated chapter draft is empty.")
     chapter_file = os.path.join(chapters_dir, f"chapter_{novel_number}.txt")
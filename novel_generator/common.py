@@ -5,6 +5,7 @@
 """
 import logging
 import re
+import threading
 import time
 import traceback
 
@@ -42,25 +43,39 @@ def debug_log(prompt: str, response_content: str):
         f"\n[######################################### Response #########################################]\n{response_content}\n"
     )
 
-def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3) -> str:
-    """调用 LLM 并清理返回结果"""
-    print("\n" + "="*50)
-    print("发送到 LLM 的提示词:")
-    print("-"*50)
-    print(prompt)
-    print("="*50 + "\n")
+# finalize_chapter 等处会在多个线程中同时调用 invoke_with_cleaning，加锁避免各自的控制台输出相互穿插
+_print_lock = threading.Lock()
+
+def _print_banner(title: str, content: str):
+    """将一整段提示词/返回内容拼成单个字符串，在锁内一次性输出到控制台。"""
+    banner = "\n".join(["\n" + "="*50, title, "-"*50, content, "="*50 + "\n"])
+    with _print_lock:
+        print(banner)
+
+def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3, on_delta=None, on_retry=None) -> str:
+    """
+    调用 LLM 并清理返回结果
+    :param on_delta: 若提供，则以流式方式调用，每收到一段输出即回调 on_delta(delta)
+    :param on_retry: 若提供，每次重试前回调 on_retry()，便于调用方丢弃上一次尝试已流式输出的内容
+    """
+    _print_banner("发送到 LLM 的提示词:", prompt)
     
     result = ""
     retry_count = 0
     
     while retry_count < max_retries:
+        if retry_count > 0 and on_retry is not None:
+            on_retry()
         try:
-            result = llm_adapter.invoke(prompt)
-            print("\n" + "="*50)
-            print("LLM 返回的内容:")
-            print("-"*50)
-            print(result)
-            print("="*50 + "\n")
+            if on_delta is None:
+                result = llm_adapter.invoke(prompt)
+            else:
+                chunks = []
+                for delta in llm_adapter.stream(prompt):
+                    chunks.append(delta)
+                    on_delta(delta)
+                result = "".join(chunks)
+            _print_banner("LLM 返回的内容:", result)
             
             # 清理结果中的特殊格式标记
             result = result.replace("```", "").strip()
@@ -68,10 +83,10 @@ def invoke_with_cleaning(llm_adapter, prompt: str, max_retries: int = 3) -> str:
                 return result
             retry_count += 1
         except Exception as e:
-            print(f"调用失败 ({retry_count + 1}/{max_retries}): {str(e)}")
+            with _print_lock:
+                print(f"调用失败 ({retry_count + 1}/{max_retries}): {str(e)}")
             retry_count += 1
             if retry_count >= max_retries:
                 raise e
     
     return result
-
@@ -5,6 +5,7 @@
 """
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from llm_adapters import create_llm_adapter
 from embedding_adapters import create_embedding_adapter
 from prompt_definitions import summary_prompt, update_character_state_prompt
@@ -58,15 +59,20 @@ def finalize_chapter(
         chapter_text=chapter_text,
         global_summary=old_global_summary
     )
-    new_global_summary = invoke_with_cleaning(llm_adapter, prompt_summary)
-    if not new_global_summary.strip():
-        new_global_summary = old_global_summary
-
     prompt_char_state = update_character_state_prompt.format(
         chapter_text=chapter_text,
         old_state=old_character_state
     )
-    new_char_state = invoke_with_cleaning(llm_adapter, prompt_char_state)
+
+    # 前文摘要与角色状态互不依赖，并发请求以缩短等待网络响应的时间
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        summary_future = executor.submit(invoke_with_cleaning, llm_adapter, prompt_summary)
+        char_state_future = executor.submit(invoke_with_cleaning, llm_adapter, prompt_char_state)
+        new_global_summary = summary_future.result()
+        new_char_state = char_state_future.result()
+
+    if not new_global_summary.strip():
+        new_global_summary = old_global_summary
     if not new_char_state.strip():
         new_char_state = old_character_state
 
@@ -10,7 +10,7 @@ import traceback
 import nltk
 import warnings
 from utils import read_file
-from novel_generator.vectorstore_utils import load_vector_store, init_vector_store
+from novel_generator.vectorstore_utils import load_vector_store, init_vector_store, ensure_nltk_data
 from langchain.docstore.document import Document
 
 # 禁用特定的Torch警告
@@ -19,8 +19,7 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 def advanced_split_content(content: str, similarity_threshold: float = 0.7, max_length: int = 500) -> list:
     """使用基本分段策略"""
-    nltk.download('punkt', quiet=True)
-    nltk.download('punkt_tab', quiet=True)
+    ensure_nltk_data()
     sentences = nltk.sent_tokenize(content)
     if not sentences:
         return []
@@ -51,13 +50,19 @@ def import_knowledge_file(
     embedding_interface_format: str,
     embedding_model_name: str,
     file_path: str,
-    filepath: str
+    filepath: str,
+    content: str = None
 ):
+    """
+    将知识库文件切分后导入向量库。
+    若调用方已读取文件内容，可通过 content 直接传入，此时 file_path 仅用于日志，不再读盘。
+    """
     logging.info(f"开始导入知识库文件: {file_path}, 接口格式: {embedding_interface_format}, 模型: {embedding_model_name}")
-    if not os.path.exists(file_path):
-        logging.warning(f"知识库文件不存在: {file_path}")
-        return
-    content = read_file(file_path)
+    if content is None:
+        if not os.path.exists(file_path):
+            logging.warning(f"知识库文件不存在: {file_path}")
+            return
+        content = read_file(file_path)
     if not content.strip():
         logging.warning("知识库文件内容为空。")
         return
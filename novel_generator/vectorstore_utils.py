@@ -10,6 +10,7 @@ import nltk
 import numpy as np
 import re
 import ssl
+import threading
 import requests
 import warnings
 from langchain_chroma import Chroma
@@ -20,9 +21,26 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"  # 禁用tokenizer并行警告
 
 from chromadb.config import Settings
 from langchain.docstore.document import Document
-from sklearn.metrics.pairwise import cosine_similarity
 from .common import call_with_retry
 
+_nltk_data_ready = False
+_nltk_data_lock = threading.Lock()
+
+def ensure_nltk_data() -> bool:
+    """
+    确保 nltk 分句所需的 punkt 数据已就绪。成功后本进程内不再重复检查/下载。
+    可在程序启动时于后台线程调用以提前预热，避免首次分句时等待下载。
+    """
+    global _nltk_data_ready
+    if _nltk_data_ready:
+        return True
+    with _nltk_data_lock:
+        if not _nltk_data_ready:
+            ok_punkt = nltk.download('punkt', quiet=True)
+            ok_punkt_tab = nltk.download('punkt_tab', quiet=True)
+            _nltk_data_ready = bool(ok_punkt and ok_punkt_tab)
+    return _nltk_data_ready
+
 def get_vectorstore_dir(filepath: str) -> str:
     """获取 vectorstore 路径"""
     return os.path.join(filepath, "vectorstore")
@@ -146,8 +164,7 @@ def split_text_for_vectorstore(chapter_text: str, max_length: int = 500, similar
     if not chapter_text.strip():
         return []
     
-    nltk.download('punkt', quiet=True)
-    nltk.download('punkt_tab', quiet=True)
+    ensure_nltk_data()
     sentences = nltk.sent_tokenize(chapter_text)
     if not sentences:
         return []
@@ -202,13 +219,15 @@ def update_vector_store(embedding_adapter, new_chapter: str, filepath: str):
         logging.warning(f"Failed to update vector store: {e}")
         traceback.print_exc()
 
-def get_relevant_context_from_vector_store(embedding_adapter, query: str, filepath: str, k: int = 2) -> str:
+def get_relevant_context_from_vector_store(embedding_adapter, query: str, filepath: str, k: int = 2, store=None) -> str:
     """
     从向量库中检索与 query 最相关的 k 条文本，拼接后返回。
     如果向量库加载/检索失败，则返回空字符串。
     最终只返回最多2000字符的检索片段。
+    连续检索多个 query 时可传入已加载的 store，避免每次重新打开向量库。
     """
-    store = load_vector_store(embedding_adapter, filepath)
+    if store is None:
+        store = load_vector_store(embedding_adapter, filepath)
     if not store:
         logging.info("No vector store found or load failed. Returning empty context.")
         return ""
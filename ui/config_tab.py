@@ -4,7 +4,7 @@ from tkinter import messagebox
 
 import customtkinter as ctk
 
-from config_manager import load_config, save_config
+from config_manager import load_config, save_config, normalize_llm_config, normalize_embedding_config
 from tooltips import tooltips
 
 
@@ -61,17 +61,20 @@ def build_ai_config_tab(self):
     def on_interface_format_changed(new_value):
         self.interface_format_var.set(new_value)
         config_data = load_config(self.config_file)
-        if config_data:
+        # 选择未变化时不重写 config.json，避免无意义的写盘
+        if config_data and config_data.get("last_interface_format") != new_value:
             config_data["last_interface_format"] = new_value
             save_config(config_data, self.config_file)
         if self.loaded_config and "llm_configs" in self.loaded_config and new_value in self.loaded_config["llm_configs"]:
-            llm_conf = self.loaded_config["llm_configs"][new_value]
-            self.api_key_var.set(llm_conf.get("api_key", ""))
-            self.base_url_var.set(llm_conf.get("base_url", self.base_url_var.get()))
-            self.model_name_var.set(llm_conf.get("model_name", ""))
-            self.temperature_var.set(llm_conf.get("temperature", 0.7))
-            self.max_tokens_var.set(llm_conf.get("max_tokens", 8192))
-            self.timeout_var.set(llm_conf.get("timeout", 600))
+            raw_conf = self.loaded_config["llm_configs"][new_value]
+            llm_conf = normalize_llm_config(raw_conf)
+            self.api_key_var.set(llm_conf["api_key"])
+            # 切换接口时 base_url / model_name 缺失则保留当前地址、清空模型名，而非套用 OpenAI 默认值
+            self.base_url_var.set(raw_conf.get("base_url", self.base_url_var.get()))
+            self.model_name_var.set(raw_conf.get("model_name", ""))
+            self.temperature_var.set(llm_conf["temperature"])
+            self.max_tokens_var.set(llm_conf["max_tokens"])
+            self.timeout_var.set(llm_conf["timeout"])
         else:
             if new_value == "Ollama":
                 self.base_url_var.set("http://localhost:11434/v1")
@@ -160,15 +163,18 @@ def build_embeddings_config_tab(self):
     def on_embedding_interface_changed(new_value):
         self.embedding_interface_format_var.set(new_value)
         config_data = load_config(self.config_file)
-        if config_data:
+        # 选择未变化时不重写 config.json，避免无意义的写盘
+        if config_data and config_data.get("last_embedding_interface_format") != new_value:
             config_data["last_embedding_interface_format"] = new_value
             save_config(config_data, self.config_file)
         if self.loaded_config and "embedding_configs" in self.loaded_config and new_value in self.loaded_config["embedding_configs"]:
-            emb_conf = self.loaded_config["embedding_configs"][new_value]
-            self.embedding_api_key_var.set(emb_conf.get("api_key", ""))
-            self.embedding_url_var.set(emb_conf.get("base_url", self.embedding_url_var.get()))
-            self.embedding_model_name_var.set(emb_conf.get("model_name", ""))
-            self.embedding_retrieval_k_var.set(str(emb_conf.get("retrieval_k", 4)))
+            raw_conf = self.loaded_config["embedding_configs"][new_value]
+            emb_conf = normalize_embedding_config(raw_conf)
+            self.embedding_api_key_var.set(emb_conf["api_key"])
+            # 同上：base_url / model_name 缺失时保留当前地址、清空模型名
+            self.embedding_url_var.set(raw_conf.get("base_url", self.embedding_url_var.get()))
+            self.embedding_model_name_var.set(raw_conf.get("model_name", ""))
+            self.embedding_retrieval_k_var.set(str(emb_conf["retrieval_k"]))
         else:
             if new_value == "Ollama":
                 self.embedding_url_var.set("http://localhost:11434/api")
@@ -235,20 +241,20 @@ def load_config_btn(self):
         self.embedding_interface_format_var.set(last_embedding)
         llm_configs = cfg.get("llm_configs", {})
         if last_llm in llm_configs:
-            llm_conf = llm_configs[last_llm]
-            self.api_key_var.set(llm_conf.get("api_key", ""))
-            self.base_url_var.set(llm_conf.get("base_url", "https://api.openai.com/v1"))
-            self.model_name_var.set(llm_conf.get("model_name", "gpt-4o-mini"))
-            self.temperature_var.set(llm_conf.get("temperature", 0.7))
-            self.max_tokens_var.set(llm_conf.get("max_tokens", 8192))
-            self.timeout_var.set(llm_conf.get("timeout", 600))
+            llm_conf = normalize_llm_config(llm_configs[last_llm])
+            self.api_key_var.set(llm_conf["api_key"])
+            self.base_url_var.set(llm_conf["base_url"])
+            self.model_name_var.set(llm_conf["model_name"])
+            self.temperature_var.set(llm_conf["temperature"])
+            self.max_tokens_var.set(llm_conf["max_tokens"])
+            self.timeout_var.set(llm_conf["timeout"])
         embedding_configs = cfg.get("embedding_configs", {})
         if last_embedding in embedding_configs:
-            emb_conf = embedding_configs[last_embedding]
-            self.embedding_api_key_var.set(emb_conf.get("api_key", ""))
-            self.embedding_url_var.set(emb_conf.get("base_url", "https://api.openai.com/v1"))
-            self.embedding_model_name_var.set(emb_conf.get("model_name", "text-embedding-ada-002"))
-            self.embedding_retrieval_k_var.set(str(emb_conf.get("retrieval_k", 4)))
+            emb_conf = normalize_embedding_config(embedding_configs[last_embedding])
+            self.embedding_api_key_var.set(emb_conf["api_key"])
+            self.embedding_url_var.set(emb_conf["base_url"])
+            self.embedding_model_name_var.set(emb_conf["model_name"])
+            self.embedding_retrieval_k_var.set(str(emb_conf["retrieval_k"]))
         other_params = cfg.get("other_params", {})
         self.topic_text.delete("0.0", "end")
         self.topic_text.insert("0.0", other_params.get("topic", ""))
@@ -18,6 +18,65 @@ from novel_generator import (
 )
 from consistency_checker import check_consistency
 
+def read_llm_settings(self) -> dict:
+    """
+    一次性读取当前界面上的 LLM 参数，返回与 config.json 中 llm_configs 同名字段的字典：
+    interface_format, api_key, base_url, model_name, temperature, max_tokens, timeout
+    """
+    return {
+        "interface_format": self.interface_format_var.get().strip(),
+        "api_key": self.api_key_var.get().strip(),
+        "base_url": self.base_url_var.get().strip(),
+        "model_name": self.model_name_var.get().strip(),
+        "temperature": self.temperature_var.get(),
+        "max_tokens": self.max_tokens_var.get(),
+        "timeout": self.safe_get_int(self.timeout_var, 600)
+    }
+
+def read_embedding_settings(self) -> dict:
+    """
+    一次性读取当前界面上的 Embedding 参数，返回与 config.json 中 embedding_configs 同名字段的字典：
+    interface_format, api_key, base_url, model_name
+    """
+    return {
+        "interface_format": self.embedding_interface_format_var.get().strip(),
+        "api_key": self.embedding_api_key_var.get().strip(),
+        "base_url": self.embedding_url_var.get().strip(),
+        "model_name": self.embedding_model_name_var.get().strip()
+    }
+
+# 流式生成时合并刷新编辑框的间隔（毫秒）
+STREAM_FLUSH_INTERVAL_MS = 50
+
+# 正在后台执行的任务名称，防止重复点击导致同一任务被并发执行多次
+_running_tasks = set()
+_running_tasks_lock = threading.Lock()
+
+def start_background_task(self, task_name: str, target) -> bool:
+    """
+    在后台线程中执行 target。若同名任务仍在执行，则不重复启动并返回 False。
+    """
+    with _running_tasks_lock:
+        if task_name in _running_tasks:
+            self.safe_log(f"⚠️ {task_name}任务仍在执行中，请等待完成后再试。")
+            return False
+        _running_tasks.add(task_name)
+
+    def runner():
+        try:
+            target()
+        finally:
+            with _running_tasks_lock:
+                _running_tasks.discard(task_name)
+
+    try:
+        threading.Thread(target=runner, daemon=True).start()
+    except Exception:
+        with _running_tasks_lock:
+            _running_tasks.discard(task_name)
+        raise
+    return True
+
 def generate_novel_architecture_ui(self):
     filepath = self.filepath_var.get().strip()
     if not filepath:
@@ -32,13 +91,7 @@ def generate_novel_architecture_ui(self):
 
         self.disable_button_safe(self.btn_generate_architecture)
         try:
-            interface_format = self.interface_format_var.get().strip()
-            api_key = self.api_key_var.get().strip()
-            base_url = self.base_url_var.get().strip()
-            model_name = self.model_name_var.get().strip()
-            temperature = self.temperature_var.get()
-            max_tokens = self.max_tokens_var.get()
-            timeout_val = self.safe_get_int(self.timeout_var, 600)
+            llm = read_llm_settings(self)
 
             topic = self.topic_text.get("0.0", "end").strip()
             genre = self.genre_var.get().strip()
@@ -49,18 +102,18 @@ def generate_novel_architecture_ui(self):
 
             self.safe_log("开始生成小说架构...")
             Novel_architecture_generate(
-                interface_format=interface_format,
-                api_key=api_key,
-                base_url=base_url,
-                llm_model=model_name,
+                interface_format=llm["interface_format"],
+                api_key=llm["api_key"],
+                base_url=llm["base_url"],
+                llm_model=llm["model_name"],
                 topic=topic,
                 genre=genre,
                 number_of_chapters=num_chapters,
                 word_number=word_number,
                 filepath=filepath,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout_val,
+                temperature=llm["temperature"],
+                max_tokens=llm["max_tokens"],
+                timeout=llm["timeout"],
                 user_guidance=user_guidance  # 添加内容指导参数
             )
             self.safe_log("✅ 小说架构生成完成。请在 'Novel Architecture' 标签页查看或编辑。")
@@ -68,7 +121,7 @@ def generate_novel_architecture_ui(self):
             self.handle_exception("生成小说架构时出错")
         finally:
             self.enable_button_safe(self.btn_generate_architecture)
-    threading.Thread(target=task, daemon=True).start()
+    start_background_task(self, "生成小说架构", task)
 
 def generate_chapter_blueprint_ui(self):
     filepath = self.filepath_var.get().strip()
@@ -82,27 +135,21 @@ def generate_chapter_blueprint_ui(self):
             return
         self.disable_button_safe(self.btn_generate_directory)
         try:
-            interface_format = self.interface_format_var.get().strip()
-            api_key = self.api_key_var.get().strip()
-            base_url = self.base_url_var.get().strip()
-            model_name = self.model_name_var.get().strip()
+            llm = read_llm_settings(self)
             number_of_chapters = self.safe_get_int(self.num_chapters_var, 10)
-            temperature = self.temperature_var.get()
-            max_tokens = self.max_tokens_var.get()
-            timeout_val = self.safe_get_int(self.timeout_var, 600)
             user_guidance = self.user_guide_text.get("0.0", "end").strip()  # 新增获取用户指导
 
             self.safe_log("开始生成章节蓝图...")
             Chapter_blueprint_generate(
-                interface_format=interface_format,
-                api_key=api_key,
-                base_url=base_url,
-                llm_model=model_name,
+                interface_format=llm["interface_format"],
+                api_key=llm["api_key"],
+                base_url=llm["base_url"],
+                llm_model=llm["model_name"],
                 number_of_chapters=number_of_chapters,
                 filepath=filepath,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout_val,
+                temperature=llm["temperature"],
+                max_tokens=llm["max_tokens"],
+                timeout=llm["timeout"],
                 user_guidance=user_guidance  # 新增参数
             )
             self.safe_log("✅ 章节蓝图生成完成。请在 'Chapter Blueprint' 标签页查看或编辑。")
@@ -110,7 +157,7 @@ def generate_chapter_blueprint_ui(self):
             self.handle_exception("生成章节蓝图时出错")
         finally:
             self.enable_button_safe(self.btn_generate_directory)
-    threading.Thread(target=task, daemon=True).start()
+    start_background_task(self, "生成章节目录", task)
 
 def generate_chapter_draft_ui(self):
     filepath = self.filepath_var.get().strip()
@@ -121,13 +168,7 @@ def generate_chapter_draft_ui(self):
     def task():
         self.disable_button_safe(self.btn_generate_chapter)
         try:
-            interface_format = self.interface_format_var.get().strip()
-            api_key = self.api_key_var.get().strip()
-            base_url = self.base_url_var.get().strip()
-            model_name = self.model_name_var.get().strip()
-            temperature = self.temperature_var.get()
-            max_tokens = self.max_tokens_var.get()
-            timeout_val = self.safe_get_int(self.timeout_var, 600)
+            llm = read_llm_settings(self)
 
             chap_num = self.safe_get_int(self.chapter_num_var, 1)
             word_number = self.safe_get_int(self.word_number_var, 3000)
@@ -138,10 +179,7 @@ def generate_chapter_draft_ui(self):
             scene_loc = self.scene_location_var.get().strip()
             time_constr = self.time_constraint_var.get().strip()
 
-            embedding_api_key = self.embedding_api_key_var.get().strip()
-            embedding_url = self.embedding_url_var.get().strip()
-            embedding_interface_format = self.embedding_interface_format_var.get().strip()
-            embedding_model_name = self.embedding_model_name_var.get().strip()
+            emb = read_embedding_settings(self)
             embedding_k = self.safe_get_int(self.embedding_retrieval_k_var, 4)
 
             self.safe_log(f"生成第{chap_num}章草稿：准备生成请求提示词...")
@@ -149,26 +187,26 @@ def generate_chapter_draft_ui(self):
             # 调用新添加的 build_chapter_prompt 函数构造初始提示词
             from novel_generator.chapter import build_chapter_prompt
             prompt_text = build_chapter_prompt(
-                api_key=api_key,
-                base_url=base_url,
-                model_name=model_name,
+                api_key=llm["api_key"],
+                base_url=llm["base_url"],
+                model_name=llm["model_name"],
                 filepath=filepath,
                 novel_number=chap_num,
                 word_number=word_number,
-                temperature=temperature,
+                temperature=llm["temperature"],
                 user_guidance=user_guidance,
                 characters_involved=char_inv,
                 key_items=key_items,
                 scene_location=scene_loc,
                 time_constraint=time_constr,
-                embedding_api_key=embedding_api_key,
-                embedding_url=embedding_url,
-                embedding_interface_format=embedding_interface_format,
-                embedding_model_name=embedding_model_name,
+                embedding_api_key=emb["api_key"],
+                embedding_url=emb["base_url"],
+                embedding_interface_format=emb["interface_format"],
+                embedding_model_name=emb["model_name"],
                 embedding_retrieval_k=embedding_k,
-                interface_format=interface_format,
-                max_tokens=max_tokens,
-                timeout=timeout_val
+                interface_format=llm["interface_format"],
+                max_tokens=llm["max_tokens"],
+                timeout=llm["timeout"]
             )
 
             # 弹出可编辑提示词对话框，等待用户确认或取消
@@ -188,7 +226,8 @@ def generate_chapter_draft_ui(self):
                 
                 # 插入角色内容
                 final_prompt = prompt_text
-                role_names = [name.strip() for name in self.char_inv_text.get("0.0", "end").strip().split(',') if name.strip()]
+                # 使用集合做成员判断，遍历角色库文件时每次查找为 O(1)
+                role_names = {name.strip() for name in self.char_inv_text.get("0.0", "end").strip().split(',') if name.strip()}
                 role_lib_path = os.path.join(filepath, "角色库")
                 role_contents = []
                 
@@ -264,40 +303,103 @@ def generate_chapter_draft_ui(self):
                 return
 
             self.safe_log("开始生成章节草稿...")
+            # 流式输出：先清空编辑框，再把模型逐段返回的内容追加进去。
+            # 逐 token 调度界面刷新开销很大，这里先缓冲，每隔 STREAM_FLUSH_INTERVAL_MS 合并刷新一次。
+            # 所有编辑框改动都在 flush 中按顺序执行；重试时清空编辑框重新开始，失败时恢复原有内容。
+            stream_state = {"pending": [], "scheduled": False, "closed": False, "reset": True, "original": None}
+            stream_lock = threading.Lock()
+
+            def flush_draft_deltas():
+                with stream_lock:
+                    text = "".join(stream_state["pending"])
+                    stream_state["pending"].clear()
+                    stream_state["scheduled"] = False
+                    reset = stream_state["reset"]
+                    stream_state["reset"] = False
+                    closed = stream_state["closed"]
+                # 生成结束后会用完整结果覆盖（或恢复）编辑框，迟到的刷新直接丢弃
+                if closed:
+                    return
+                if reset:
+                    if stream_state["original"] is None:
+                        stream_state["original"] = self.chapter_result.get("0.0", "end-1c")
+                    self.chapter_result.delete("0.0", "end")
+                if text:
+                    self.chapter_result.insert("end", text)
+                    self.chapter_result.see("end")
+
+            def schedule_flush(delay_ms):
+                # 调用方需持有 stream_lock
+                if stream_state["scheduled"]:
+                    return
+                stream_state["scheduled"] = True
+                self.master.after(delay_ms, flush_draft_deltas)
+
+            def on_draft_delta(delta):
+                with stream_lock:
+                    stream_state["pending"].append(delta)
+                    schedule_flush(STREAM_FLUSH_INTERVAL_MS)
+
+            def on_draft_retry():
+                # 丢弃上一次失败尝试的输出，下次刷新时先清空编辑框
+                with stream_lock:
+                    stream_state["pending"].clear()
+                    stream_state["reset"] = True
+                    schedule_flush(0)
+
+            def restore_original_text():
+                if stream_state["original"] is not None:
+                    self.show_chapter_in_textbox(stream_state["original"])
+
+            with stream_lock:
+                schedule_flush(0)
+
             from novel_generator.chapter import generate_chapter_draft
-            draft_text = generate_chapter_draft(
-                api_key=api_key,
-                base_url=base_url,
-                model_name=model_name,
-                filepath=filepath,
-                novel_number=chap_num,
-                word_number=word_number,
-                temperature=temperature,
-                user_guidance=user_guidance,
-                characters_involved=char_inv,
-                key_items=key_items,
-                scene_location=scene_loc,
-                time_constraint=time_constr,
-                embedding_api_key=embedding_api_key,
-                embedding_url=embedding_url,
-                embedding_interface_format=embedding_interface_format,
-                embedding_model_name=embedding_model_name,
-                embedding_retrieval_k=embedding_k,
-                interface_format=interface_format,
-                max_tokens=max_tokens,
-                timeout=timeout_val,
-                custom_prompt_text=edited_prompt  # 使用用户编辑后的提示词
-            )
+            try:
+                draft_text = generate_chapter_draft(
+                    api_key=llm["api_key"],
+                    base_url=llm["base_url"],
+                    model_name=llm["model_name"],
+                    filepath=filepath,
+                    novel_number=chap_num,
+                    word_number=word_number,
+                    temperature=llm["temperature"],
+                    user_guidance=user_guidance,
+                    characters_involved=char_inv,
+                    key_items=key_items,
+                    scene_location=scene_loc,
+                    time_constraint=time_constr,
+                    embedding_api_key=emb["api_key"],
+                    embedding_url=emb["base_url"],
+                    embedding_interface_format=emb["interface_format"],
+                    embedding_model_name=emb["model_name"],
+                    embedding_retrieval_k=embedding_k,
+                    interface_format=llm["interface_format"],
+                    max_tokens=llm["max_tokens"],
+                    timeout=llm["timeout"],
+                    custom_prompt_text=edited_prompt,  # 使用用户编辑后的提示词
+                    stream_callback=on_draft_delta,
+                    stream_reset_callback=on_draft_retry
+                )
+            except Exception:
+                # 全部重试失败：丢弃已流式输出的残缺内容，恢复编辑框原有文本，避免被定稿写入磁盘
+                self.master.after(0, restore_original_text)
+                raise
+            finally:
+                # 无论成功或失败都停止接收流式输出，已排队的刷新不再写入编辑框
+                with stream_lock:
+                    stream_state["closed"] = True
             if draft_text:
                 self.safe_log(f"✅ 第{chap_num}章草稿生成完成。请在左侧查看或编辑。")
                 self.master.after(0, lambda: self.show_chapter_in_textbox(draft_text))
             else:
                 self.safe_log("⚠️ 本章草稿生成失败或无内容。")
+                self.master.after(0, restore_original_text)
         except Exception:
             self.handle_exception("生成章节草稿时出错")
         finally:
             self.enable_button_safe(self.btn_generate_chapter)
-    threading.Thread(target=task, daemon=True).start()
+    start_background_task(self, "生成章节草稿", task)
 
 def finalize_chapter_ui(self):
     filepath = self.filepath_var.get().strip()
@@ -312,18 +414,9 @@ def finalize_chapter_ui(self):
 
         self.disable_button_safe(self.btn_finalize_chapter)
         try:
-            interface_format = self.interface_format_var.get().strip()
-            api_key = self.api_key_var.get().strip()
-            base_url = self.base_url_var.get().strip()
-            model_name = self.model_name_var.get().strip()
-            temperature = self.temperature_var.get()
-            max_tokens = self.max_tokens_var.get()
-            timeout_val = self.safe_get_int(self.timeout_var, 600)
-
-            embedding_api_key = self.embedding_api_key_var.get().strip()
-            embedding_url = self.embedding_url_var.get().strip()
-            embedding_interface_format = self.embedding_interface_format_var.get().strip()
-            embedding_model_name = self.embedding_model_name_var.get().strip()
+            llm = read_llm_settings(self)
+
+            emb = read_embedding_settings(self)
 
             chap_num = self.safe_get_int(self.chapter_num_var, 1)
             word_number = self.safe_get_int(self.word_number_var, 3000)
@@ -343,13 +436,13 @@ def finalize_chapter_ui(self):
                     enriched = enrich_chapter_text(
                         chapter_text=edited_text,
                         word_number=word_number,
-                        api_key=api_key,
-                        base_url=base_url,
-                        model_name=model_name,
-                        temperature=temperature,
-                        interface_format=interface_format,
-                        max_tokens=max_tokens,
-                        timeout=timeout_val
+                        api_key=llm["api_key"],
+                        base_url=llm["base_url"],
+                        model_name=llm["model_name"],
+                        temperature=llm["temperature"],
+                        interface_format=llm["interface_format"],
+                        max_tokens=llm["max_tokens"],
+                        timeout=llm["timeout"]
                     )
                     edited_text = enriched
                     self.master.after(0, lambda: self.chapter_result.delete("0.0", "end"))
@@ -360,28 +453,28 @@ def finalize_chapter_ui(self):
             finalize_chapter(
                 novel_number=chap_num,
                 word_number=word_number,
-                api_key=api_key,
-                base_url=base_url,
-                model_name=model_name,
-                temperature=temperature,
+                api_key=llm["api_key"],
+                base_url=llm["base_url"],
+                model_name=llm["model_name"],
+                temperature=llm["temperature"],
                 filepath=filepath,
-                embedding_api_key=embedding_api_key,
-                embedding_url=embedding_url,
-                embedding_interface_format=embedding_interface_format,
-                embedding_model_name=embedding_model_name,
-                interface_format=interface_format,
-                max_tokens=max_tokens,
-                timeout=timeout_val
+                embedding_api_key=emb["api_key"],
+                embedding_url=emb["base_url"],
+                embedding_interface_format=emb["interface_format"],
+                embedding_model_name=emb["model_name"],
+                interface_format=llm["interface_format"],
+                max_tokens=llm["max_tokens"],
+                timeout=llm["timeout"]
             )
             self.safe_log(f"✅ 第{chap_num}章定稿完成（已更新前文摘要、角色状态、向量库）。")
 
-            final_text = read_file(chapter_file)
-            self.master.after(0, lambda: self.show_chapter_in_textbox(final_text))
+            # 定稿不会改写章节文件，直接使用刚写入的内容即可，无需重新读盘
+            self.master.after(0, lambda: self.show_chapter_in_textbox(edited_text))
         except Exception:
             self.handle_exception("定稿章节时出错")
         finally:
             self.enable_button_safe(self.btn_finalize_chapter)
-    threading.Thread(target=task, daemon=True).start()
+    start_background_task(self, "定稿章节", task)
 
 def do_consistency_check(self):
     filepath = self.filepath_var.get().strip()
@@ -392,13 +485,7 @@ def do_consistency_check(self):
     def task():
         self.disable_button_safe(self.btn_check_consistency)
         try:
-            api_key = self.api_key_var.get().strip()
-            base_url = self.base_url_var.get().strip()
-            model_name = self.model_name_var.get().strip()
-            temperature = self.temperature_var.get()
-            interface_format = self.interface_format_var.get()
-            max_tokens = self.max_tokens_var.get()
-            timeout = self.timeout_var.get()
+            llm = read_llm_settings(self)
 
             chap_num = self.safe_get_int(self.chapter_num_var, 1)
             chap_file = os.path.join(filepath, "chapters", f"chapter_{chap_num}.txt")
@@ -414,13 +501,13 @@ def do_consistency_check(self):
                 character_state=read_file(os.path.join(filepath, "character_state.txt")),
                 global_summary=read_file(os.path.join(filepath, "global_summary.txt")),
                 chapter_text=chapter_text,
-                api_key=api_key,
-                base_url=base_url,
-                model_name=model_name,
-                temperature=temperature,
-                interface_format=interface_format,
-                max_tokens=max_tokens,
-                timeout=timeout,
+                api_key=llm["api_key"],
+                base_url=llm["base_url"],
+                model_name=llm["model_name"],
+                temperature=llm["temperature"],
+                interface_format=llm["interface_format"],
+                max_tokens=llm["max_tokens"],
+                timeout=llm["timeout"],
                 plot_arcs=""
             )
             self.safe_log("审校结果：")
@@ -429,7 +516,7 @@ def do_consistency_check(self):
             self.handle_exception("审校时出错")
         finally:
             self.enable_button_safe(self.btn_check_consistency)
-    threading.Thread(target=task, daemon=True).start()
+    start_background_task(self, "一致性审校", task)
 
 def import_knowledge_handler(self):
     selected_file = tk.filedialog.askopenfilename(
@@ -440,19 +527,23 @@ def import_knowledge_handler(self):
         def task():
             self.disable_button_safe(self.btn_import_knowledge)
             try:
-                emb_api_key = self.embedding_api_key_var.get().strip()
-                emb_url = self.embedding_url_var.get().strip()
-                emb_format = self.embedding_interface_format_var.get().strip()
-                emb_model = self.embedding_model_name_var.get().strip()
+                emb = read_embedding_settings(self)
+
+                # 只读取一次原始字节，再在内存中尝试不同编码解码
+                try:
+                    with open(selected_file, 'rb') as f:
+                        raw = f.read()
+                except Exception as e:
+                    self.safe_log(f"读取文件时发生错误: {str(e)}")
+                    raise
 
-                # 尝试不同编码读取文件
                 content = None
                 encodings = ['utf-8', 'gbk', 'gb2312', 'ansi']
                 for encoding in encodings:
                     try:
-                        with open(selected_file, 'r', encoding=encoding) as f:
-                            content = f.read()
-                            break
+                        # 按字节解码不会进行通用换行转换，需手动统一为 \n，与文本模式 open() 读取结果保持一致
+                        content = raw.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+                        break
                     except UnicodeDecodeError:
                         continue
                     except Exception as e:
@@ -462,30 +553,17 @@ def import_knowledge_handler(self):
                 if content is None:
                     raise Exception("无法以任何已知编码格式读取文件")
 
-                # 创建临时UTF-8文件
-                import tempfile
-                import os
-                with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False, suffix='.txt') as temp:
-                    temp.write(content)
-                    temp_path = temp.name
-
-                try:
-                    self.safe_log(f"开始导入知识库文件: {selected_file}")
-                    import_knowledge_file(
-                        embedding_api_key=emb_api_key,
-                        embedding_url=emb_url,
-                        embedding_interface_format=emb_format,
-                        embedding_model_name=emb_model,
-                        file_path=temp_path,
-                        filepath=self.filepath_var.get().strip()
-                    )
-                    self.safe_log("✅ 知识库文件导入完成。")
-                finally:
-                    # 清理临时文件
-                    try:
-                        os.unlink(temp_path)
-                    except:
-                        pass
+                self.safe_log(f"开始导入知识库文件: {selected_file}")
+                import_knowledge_file(
+                    embedding_api_key=emb["api_key"],
+                    embedding_url=emb["base_url"],
+                    embedding_interface_format=emb["interface_format"],
+                    embedding_model_name=emb["model_name"],
+                    file_path=selected_file,
+                    filepath=self.filepath_var.get().strip(),
+                    content=content
+                )
+                self.safe_log("✅ 知识库文件导入完成。")
 
             except Exception:
                 self.handle_exception("导入知识库时出错")
@@ -493,8 +571,7 @@ def import_knowledge_handler(self):
                 self.enable_button_safe(self.btn_import_knowledge)
 
         try:
-            thread = threading.Thread(target=task, daemon=True)
-            thread.start()
+            start_background_task(self, "导入知识库", task)
         except Exception as e:
             self.enable_button_safe(self.btn_import_knowledge)
             messagebox.showerror("错误", f"线程启动失败: {str(e)}")
@@ -10,9 +10,10 @@ from tkinter import filedialog, messagebox
 from .role_library import RoleLibrary
 from llm_adapters import create_llm_adapter
 
-from config_manager import load_config, save_config, test_llm_config, test_embedding_config
+from config_manager import load_config, save_config, test_llm_config, test_embedding_config, normalize_llm_config, normalize_embedding_config
 from utils import read_file, save_string_to_txt, clear_file_content
 from tooltips import tooltips
+from novel_generator import ensure_nltk_data
 
 from ui.context_menu import TextWidgetContextMenu
 from ui.main_tab import build_main_tab, build_left_layout, build_right_layout
@@ -60,42 +61,30 @@ class NovelGeneratorGUI:
             last_embedding = "OpenAI"
 
         if self.loaded_config and "llm_configs" in self.loaded_config and last_llm in self.loaded_config["llm_configs"]:
-            llm_conf = self.loaded_config["llm_configs"][last_llm]
+            llm_conf = normalize_llm_config(self.loaded_config["llm_configs"][last_llm])
         else:
-            llm_conf = {
-                "api_key": "",
-                "base_url": "https://api.openai.com/v1",
-                "model_name": "gpt-4o-mini",
-                "temperature": 0.7,
-                "max_tokens": 8192,
-                "timeout": 600
-            }
+            llm_conf = normalize_llm_config({})
 
         if self.loaded_config and "embedding_configs" in self.loaded_config and last_embedding in self.loaded_config["embedding_configs"]:
-            emb_conf = self.loaded_config["embedding_configs"][last_embedding]
+            emb_conf = normalize_embedding_config(self.loaded_config["embedding_configs"][last_embedding])
         else:
-            emb_conf = {
-                "api_key": "",
-                "base_url": "https://api.openai.com/v1",
-                "model_name": "text-embedding-ada-002",
-                "retrieval_k": 4
-            }
+            emb_conf = normalize_embedding_config({})
 
         # -- LLM通用参数 --
-        self.api_key_var = ctk.StringVar(value=llm_conf.get("api_key", ""))
-        self.base_url_var = ctk.StringVar(value=llm_conf.get("base_url", "https://api.openai.com/v1"))
+        self.api_key_var = ctk.StringVar(value=llm_conf["api_key"])
+        self.base_url_var = ctk.StringVar(value=llm_conf["base_url"])
         self.interface_format_var = ctk.StringVar(value=last_llm)
-        self.model_name_var = ctk.StringVar(value=llm_conf.get("model_name", "gpt-4o-mini"))
-        self.temperature_var = ctk.DoubleVar(value=llm_conf.get("temperature", 0.7))
-        self.max_tokens_var = ctk.IntVar(value=llm_conf.get("max_tokens", 8192))
-        self.timeout_var = ctk.IntVar(value=llm_conf.get("timeout", 600))
+        self.model_name_var = ctk.StringVar(value=llm_conf["model_name"])
+        self.temperature_var = ctk.DoubleVar(value=llm_conf["temperature"])
+        self.max_tokens_var = ctk.IntVar(value=llm_conf["max_tokens"])
+        self.timeout_var = ctk.IntVar(value=llm_conf["timeout"])
 
         # -- Embedding相关 --
         self.embedding_interface_format_var = ctk.StringVar(value=last_embedding)
-        self.embedding_api_key_var = ctk.StringVar(value=emb_conf.get("api_key", ""))
-        self.embedding_url_var = ctk.StringVar(value=emb_conf.get("base_url", "https://api.openai.com/v1"))
-        self.embedding_model_name_var = ctk.StringVar(value=emb_conf.get("model_name", "text-embedding-ada-002"))
-        self.embedding_retrieval_k_var = ctk.StringVar(value=str(emb_conf.get("retrieval_k", 4)))
+        self.embedding_api_key_var = ctk.StringVar(value=emb_conf["api_key"])
+        self.embedding_url_var = ctk.StringVar(value=emb_conf["base_url"])
+        self.embedding_model_name_var = ctk.StringVar(value=emb_conf["model_name"])
+        self.embedding_retrieval_k_var = ctk.StringVar(value=str(emb_conf["retrieval_k"]))
 
         # -- 小说参数相关 --
         if self.loaded_config and "other_params" in self.loaded_config:
@@ -139,6 +128,9 @@ class NovelGeneratorGUI:
         build_summary_tab(self)
         build_chapters_tab(self)
 
+        # 后台预热 nltk 分句数据，避免首次定稿/导入知识库时才开始检查下载
+        threading.Thread(target=ensure_nltk_data, daemon=True).start()
+
     # ----------------- 通用辅助函数 -----------------
     def show_tooltip(self, key: str):
         info_text = tooltips.get(key, "暂无说明")
@@ -243,6 +235,7 @@ class NovelGeneratorGUI:
         # 获取角色库路径
         role_lib_path = os.path.join(self.filepath_var.get().strip(), "角色库")
         self.selected_roles = []  # 存储选中的角色名称
+        seen_role_names = set()  # 已添加的角色名，用于 O(1) 去重
         
         # 动态加载角色分类
         if os.path.exists(role_lib_path):
@@ -272,10 +265,11 @@ class NovelGeneratorGUI:
                     for role_file in os.listdir(category_path):
                         if role_file.endswith(".txt"):
                             role_name = os.path.splitext(role_file)[0]
-                            if not any(name == role_name for _, name in self.selected_roles):
+                            if role_name not in seen_role_names:
                                 chk = ctk.CTkCheckBox(category_frame, text=role_name)
                                 chk.grid(row=row_num, column=col_num, padx=5, pady=2, sticky="w")
                                 self.selected_roles.append((chk, role_name))
+                                seen_role_names.add(role_name)
                                 
                                 # 更新行列位置
                                 role_count += 1